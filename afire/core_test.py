@@ -14,20 +14,27 @@
 
 """Tests for the core module."""
 
-from __future__ import absolute_import
-from __future__ import division
-from __future__ import print_function
-
 from afire import core
+from afire import interact
 from afire import test_components as tc
 from afire import testutils
 from afire import trace
-import mock
 
 import six
 
 
 class CoreTest(testutils.BaseTestCase):
+    def setUp(self):
+        super(CoreTest, self).setUp()
+        # Swap Embed directly; mock.patch is comparatively slow to set up.
+        self.embed_calls = []
+        self._original_embed = interact.Embed
+        interact.Embed = lambda *args, **kwargs: self.embed_calls.append((args, kwargs))
+
+    def tearDown(self):
+        interact.Embed = self._original_embed
+        super(CoreTest, self).tearDown()
+
     def testOneLineResult(self):
         self.assertEqual(core._OneLineResult(1), "1")  # pylint: disable=protected-access
         self.assertEqual(core._OneLineResult("hello"), "hello")  # pylint: disable=protected-access
@@ -40,33 +47,29 @@ class CoreTest(testutils.BaseTestCase):
             core._OneLineResult(circular_reference.create()), "{'y': {...}}"  # pylint: disable=protected-access
         )
 
-    @mock.patch("afire.interact.Embed")
-    def testInteractiveMode(self, mock_embed):
+    def testInteractiveMode(self):
         core.Fire(tc.TypedProperties, command=["alpha"])
-        self.assertFalse(mock_embed.called)
+        self.assertFalse(self.embed_calls)
         core.Fire(tc.TypedProperties, command=["alpha", "--", "-i"])
-        self.assertTrue(mock_embed.called)
+        self.assertTrue(self.embed_calls)
 
-    @mock.patch("afire.interact.Embed")
-    def testInteractiveModeFullArgument(self, mock_embed):
+    def testInteractiveModeFullArgument(self):
         core.Fire(tc.TypedProperties, command=["alpha", "--", "--interactive"])
-        self.assertTrue(mock_embed.called)
+        self.assertTrue(self.embed_calls)
 
-    @mock.patch("afire.interact.Embed")
-    def testInteractiveModeVariables(self, mock_embed):
+    def testInteractiveModeVariables(self):
         core.Fire(tc.WithDefaults, command=["double", "2", "--", "-i"])
-        self.assertTrue(mock_embed.called)
-        (variables, verbose), unused_kwargs = mock_embed.call_args
+        self.assertTrue(self.embed_calls)
+        (variables, verbose), unused_kwargs = self.embed_calls[-1]
         self.assertFalse(verbose)
         self.assertEqual(variables["result"], 4)
         self.assertIsInstance(variables["self"], tc.WithDefaults)
         self.assertIsInstance(variables["trace"], trace.FireTrace)
 
-    @mock.patch("afire.interact.Embed")
-    def testInteractiveModeVariablesWithName(self, mock_embed):
+    def testInteractiveModeVariablesWithName(self):
         core.Fire(tc.WithDefaults, command=["double", "2", "--", "-i", "-v"], name="D")
-        self.assertTrue(mock_embed.called)
-        (variables, verbose), unused_kwargs = mock_embed.call_args
+        self.assertTrue(self.embed_calls)
+        (variables, verbose), unused_kwargs = self.embed_calls[-1]
         self.assertTrue(verbose)
         self.assertEqual(variables["result"], 4)
         self.assertIsInstance(variables["self"], tc.WithDefaults)
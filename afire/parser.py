@@ -14,19 +14,48 @@
 
 """Provides parsing functionality used by Python Fire."""
 
-from __future__ import absolute_import
-from __future__ import division
-from __future__ import print_function
-
 import argparse
-import platform
 import ast
+import copy
+import sys
 from datetime import datetime, date
-from typing import Union, Optional, Type, List, Tuple, Callable, Any, Dict, Set, TypeVar
-from functools import partial
+from typing import Union, Optional, Type, List, Tuple, Callable, Any, Dict, TypeVar
+from functools import lru_cache, wraps
+
+try:
+    from types import UnionType as _UnionType
+except ImportError:  # Python < 3.10
+    _UnionType = None
+
+_IS_PY311 = sys.version_info[:2] == (3, 11)
+
+_NONE_TYPE = type(None)
+
+
+def _CacheByType(fn):
+    """Memoizes a function whose only argument is a type annotation.
+
+    The cache is keyed on the identity of the annotation as well as the
+    annotation itself: typing considers Union[int, str] and Union[str, int]
+    equal, but they must be parsed in different orders. Unhashable annotations
+    bypass the cache.
+    """
+    cached_fn = lru_cache(maxsize=256)(lambda unused_id, t: fn(t))
+
+    @wraps(fn)
+    def Wrapper(t):
+        try:
+            hash(t)
+        except TypeError:
+            return fn(t)
+        return cached_fn(id(t), t)
+
+    return Wrapper
 
 
+@lru_cache(maxsize=1)
 def CreateParser():
+    # The parser holds no per-parse state, so a single instance is shared.
     parser = argparse.ArgumentParser(add_help=False)
     parser.add_argument("--verbose", "-v", action="store_true")
     parser.add_argument("--interactive", "-i", action="store_true")
@@ -50,23 +79,54 @@ def SeparateFlagArgs(args):
     Returns:
       A tuple with the Fire args (a list), followed by the Flag args (a list).
     """
-    if "--" in args:
-        separator_index = len(args) - 1 - args[::-1].index("--")  # index of last --
-        flag_args = args[separator_index + 1 :]
-        args = args[:separator_index]
-        return args, flag_args
+    for separator_index in range(len(args) - 1, -1, -1):  # find the last --
+        if args[separator_index] == "--":
+            flag_args = args[separator_index + 1 :]
+            args = args[:separator_index]
+            return args, flag_args
     return args, []
 
 
+# The formats accepted by ParseTime, in the order they are tried.
+_TIME_FORMATS = (
+    "%Y-%m-%d-%H:%M:%S",
+    "%Y-%m-%d %H:%M:%S",
+    "%Y/%m/%d %H:%M:%S",
+    "%Y%m%d%H%M%S",
+    "%Y/%m/%d",
+    "%Y-%m-%d",
+)
+
+
+def _GuessTimeFormat(value: str) -> Optional[str]:
+    """Picks the only ParseTime format that can match a value of this shape."""
+    length = len(value)
+    if length == 10:
+        if value[4] == "-":
+            return "%Y-%m-%d"
+        if value[4] == "/":
+            return "%Y/%m/%d"
+    elif length == 19:
+        if value[10] == "-":
+            return "%Y-%m-%d-%H:%M:%S"
+        if value[10] == " ":
+            return "%Y/%m/%d %H:%M:%S" if value[4] == "/" else "%Y-%m-%d %H:%M:%S"
+    elif length == 14 and value.isdigit():
+        return "%Y%m%d%H%M%S"
+    return None
+
+
 def ParseTime(value: str) -> datetime:
-    for format in [
-        "%Y-%m-%d-%H:%M:%S",
-        "%Y-%m-%d %H:%M:%S",
-        "%Y/%m/%d %H:%M:%S",
-        "%Y%m%d%H%M%S",
-        "%Y/%m/%d",
-        "%Y-%m-%d",
-    ]:
+    # Try the format implied by the shape of the value first, so the common
+    # cases don't pay for a failed strptime per unmatched format.
+    if isinstance(value, str):
+        format = _GuessTimeFormat(value)
+        if format is not None:
+            try:
+                return datetime.strptime(value, format)
+            except ValueError:
+                pass
+    for format in _TIME_FORMATS:
         try:
             return datetime.strptime(value, format)
         except (ValueError, TypeError):
@@ -76,144 +136,242 @@ def ParseTime(value: str) -> datetime:
 
 def _DeGenericAlias(t) -> Tuple[Type, List[Type]]:
     origin_type = None
-    if platform.python_version().startswith("3.11."):
-        if "__class__" in dir(t):
-            from types import UnionType
-
-            if t.__class__ == UnionType:
-                origin_type = Union
+    if _IS_PY311 and _UnionType is not None and type(t) is _UnionType:
+        origin_type = Union
     if origin_type is None:
         origin_type = t.__origin__
 
     if IsGenericAlias(t):
-        if "__args__" not in dir(t):
-            return origin_type, [Any]
+        if not hasattr(t, "__args__"):
+            return origin_type, (Any,)
         return origin_type, t.__args__
-    return t, []
+    return t, ()
 
 
 def IsGenericAlias(t) -> bool:
-    if platform.python_version().startswith("3.11."):
-        if "__class__" in dir(t):
-            from types import UnionType
-
-            if t.__class__ == UnionType:
-                return True
-    return "__origin__" in dir(t)
+    if _IS_PY311 and _UnionType is not None and type(t) is _UnionType:
+        return True
+    return hasattr(t, "__origin__")
 
 
 def ParseComplexValue(value: str, t):
+    return _CompileComplexParser(t)(value)
+
+
+@_CacheByType
+def _CompileComplexParser(t) -> Callable[[str], Any]:
+    """Builds the function parsing a command line string as the generic type t.
+
+    Members of a Union are tried in order on the raw string, while containers
+    are parsed as a Python literal first and then converted element-wise.
+    """
     origin, args = _DeGenericAlias(t)
-    if origin in (Union, Optional):
-        if value == "None" and (origin == Optional or (origin == Union and type(None) in args)):
-            return None
+    if origin is Union:
+        accepts_none, members = _SplitNoneType(args)
+        member_parsers = tuple(
+            _CompileComplexParser(each_type) if IsGenericAlias(each_type) else _LookupTypeParser(each_type)
+            for each_type in members
+        )
+
+        def ParseUnion(value):
+            if accepts_none and value == "None":
+                return None
+            for parse_fn in member_parsers:
+                try:
+                    return parse_fn(value)
+                except ValueError:
+                    pass
+            raise ValueError(f'cannot parse value "{value}" to type {t}')
 
-        for each_type in args:
-            try:
-                if IsGenericAlias(each_type):
-                    return ParseComplexValue(value, each_type)
+        return ParseUnion
+
+    if _LookupConverterCompiler(origin) is not None:
+        convert_fn = _CompileConverter(t)
+        return lambda value: convert_fn(DefaultParseValue(value))
+
+    def Unsupported(value):
+        raise ValueError(f'cannot parse value "{value}" to type {t}')
+
+    return Unsupported
 
-                if each_type is type(None):
-                    continue
-                return SpecTypeParseValueGen(each_type)(value)
-            except ValueError as e:
-                ...
-    elif issubclass(origin, (Dict, List, Set, Tuple, bytes)):
-        return _ParseConvert(DefaultParseValue(value), t)
 
-    raise ValueError(f'cannot parse value "{value}" to type {t}')
+@_CacheByType
+def _CompileConverter(t) -> Callable[[Any], Any]:
+    """Builds the function converting an already parsed literal to the type t."""
+    if not IsGenericAlias(t):
+        if t is _NONE_TYPE:
+            return _ConvertNone
+        if t is TypeVar or isinstance(t, TypeVar) or t is Any:
+            return lambda parsed: parsed
+        return _LookupTypeParser(t)
 
+    def Unsupported(parsed):
+        raise ValueError(f"not support type {t} yet")
 
-def _ParseConvert(parsed: Any, t):
     origin, args = _DeGenericAlias(t)
-    if origin == Union:
-        # if is None, return directly
-        if type(None) in args and parsed is None:
+    compile_fn = _LookupConverterCompiler(origin)
+    if compile_fn is None:
+        return Unsupported
+    try:
+        return compile_fn(t, args)
+    except (IndexError, TypeError, ValueError):
+        # The args don't fit the origin, e.g. typing.Counter[str] is a dict
+        # with one arg. Fail when called, so an enclosing Union can move on.
+        return Unsupported
+
+
+def _LookupTypeParser(t) -> Callable[[Any], Any]:
+    """Returns a function parsing a value with TypeToParser's entry for t.
+
+    The entry is looked up on every call rather than once, since compiled
+    parsers are cached and TypeToParser may be extended after they are built.
+    """
+    return lambda value: TypeToParser.get(t, t)(value)
+
+
+def _ConvertNone(parsed):
+    if parsed is not None:
+        raise ValueError(f'cannot parse value: "{parsed}" to type None')
+    return None
+
+
+def _SplitNoneType(args):
+    """Splits the args of a Union into whether it accepts None and its other members.
+
+    None is always checked before the other members are tried, so it is taken
+    out of the member list once here instead of being skipped on every parse.
+    """
+    members = tuple(each_type for each_type in args if each_type is not _NONE_TYPE)
+    return len(members) != len(args), members
+
+
+def _CompileUnionConverter(t, args):
+    accepts_none, members = _SplitNoneType(args)
+    member_converters = tuple(_CompileConverter(each_type) for each_type in members)
+
+    def ConvertUnion(parsed):
+        if accepts_none and parsed is None:
             return None
-        for may_type in args:
-            # filter None type
-            if may_type == type(None):
-                continue
-            else:
-                try:
-                    if IsGenericAlias(may_type):
-                        return _ParseConvert(parsed, may_type)
-                    else:
-                        return TypeToParser.get(may_type, may_type)(parsed)
-                except ValueError:
-                    continue
+        for convert_fn in member_converters:
+            try:
+                return convert_fn(parsed)
+            except ValueError:
+                pass
         raise ValueError(f'cannot parse value "{parsed}" to type {t}')
-    elif issubclass(origin, (Tuple, List, Set)):
-        res = []
-        if issubclass(origin, Tuple):
-            res_t = tuple
-        else:
-            if issubclass(origin, Set):
-                res_t = set
-            else:
-                res_t = list
-            args *= len(parsed)
-        if len(parsed) != len(args):
+
+    return ConvertUnion
+
+
+def _CompileTupleConverter(t, args):
+    item_converters = tuple(_CompileConverter(each_type) for each_type in args)
+
+    def ConvertTuple(parsed):
+        if len(parsed) != len(item_converters):
             raise ValueError(f"number of args mismatch in type: {t} and value: {parsed}")
-        for each_type, each_value in zip(args, parsed):
-            if IsGenericAlias(each_type):
-                res.append(_ParseConvert(each_value, each_type))
-            elif type(None) == each_type:
-                if each_value is not None:
-                    raise ValueError(f'cannot parse value: "{each_value}" to type None in Tuple: {parsed}')
-            elif each_type == TypeVar or type(each_type) == TypeVar or each_type is Any:
-                res.append(each_value)
-            else:
-                res.append(TypeToParser.get(each_type, each_type)(each_value))
-        return res_t(res)
-    elif issubclass(origin, Dict):
-        res = {}
-        key_t, value_t = args
+        return tuple(convert_fn(each_value) for convert_fn, each_value in zip(item_converters, parsed))
+
+    return ConvertTuple
+
+
+def _CompileListConverter(t, args):
+    item_converter = _CompileConverter(args[0])
+    return lambda parsed: [item_converter(each_value) for each_value in parsed]
+
+
+def _CompileSetConverter(t, args):
+    item_converter = _CompileConverter(args[0])
+    return lambda parsed: {item_converter(each_value) for each_value in parsed}
+
+
+def _CompileDictConverter(t, args):
+    key_converter, value_converter = (_CompileConverter(each_type) for each_type in args)
+
+    def ConvertDict(parsed):
         if not isinstance(parsed, Dict):
             raise ValueError(f"the type hint is {t}, but got type: {type(parsed).__name__}, value: {parsed}")
-        for k, v in parsed.items():
-            if key_t == TypeVar or type(key_t) == TypeVar:
-                res_key = k
-            elif IsGenericAlias(key_t):
-                res_key = _ParseConvert(k, key_t)
-            else:
-                res_key = TypeToParser.get(key_t, key_t)(k)
-
-            if value_t == TypeVar:
-                res_value = v
-            elif IsGenericAlias(value_t):
-                res_value = _ParseConvert(v, value_t)
-            else:
-                res_value = TypeToParser.get(value_t, value_t)(v)
-
-            res[res_key] = res_value
-        return res
-    elif issubclass(origin, bytes):
+        return {key_converter(k): value_converter(v) for k, v in parsed.items()}
+
+    return ConvertDict
+
+
+def _CompileBytesConverter(t, args):
+    def ConvertBytes(parsed):
         if isinstance(parsed, str):
             return parsed.encode("utf8")
         if not isinstance(parsed, bytes):
             raise ValueError(f"the type hint is {t}, but got type: {type(parsed).__name__}, value: {parsed}")
         return parsed
-    raise ValueError(f"not support type {t} yet")
+
+    return ConvertBytes
+
+
+_OriginToConverterCompiler = {
+    Union: _CompileUnionConverter,
+    tuple: _CompileTupleConverter,
+    list: _CompileListConverter,
+    set: _CompileSetConverter,
+    dict: _CompileDictConverter,
+    bytes: _CompileBytesConverter,
+}
+
+
+def _LookupConverterCompiler(origin):
+    compile_fn = _OriginToConverterCompiler.get(origin)
+    if compile_fn is None:
+        # Subclasses of the supported containers convert like their base.
+        for base in getattr(origin, "__mro__", ())[1:]:
+            compile_fn = _OriginToConverterCompiler.get(base)
+            if compile_fn is not None:
+                break
+    return compile_fn
 
 
 def _BytesParser(value) -> bytes:
-    if value.startswith('b"') or value.startswith("b'"):
+    if isinstance(value, str) and value.startswith(('b"', "b'")):
         value = DefaultParseValue(value)
     if isinstance(value, str):
         return value.encode("utf8")
     elif isinstance(value, bytes):
         return value
     elif isinstance(value, int):
-        return value.to_bytes(8, "big")
+        try:
+            return value.to_bytes(8, "big")
+        except OverflowError:  # Negative, or too large for 8 bytes.
+            raise ValueError(f"cannot convert type: {type(value)}, value: {value} as type bytes") from None
     else:
         raise ValueError(f"cannot convert type: {type(value)}, value: {value} as type bytes")
 
 
+_TRUE_STRINGS = frozenset(("True", "true", "1"))
+_FALSE_STRINGS = frozenset(("False", "false", "0", ""))
+
+
+def _BoolParser(value) -> bool:
+    if isinstance(value, str):
+        if value in _TRUE_STRINGS:
+            return True
+        if value in _FALSE_STRINGS:
+            return False
+    elif type(value) in (bool, int) and value in (0, 1):
+        # Already parsed values, e.g. list items, may only be bools or ints 0/1;
+        # floats such as 1.0 are rejected even though they compare equal to True.
+        return bool(value)
+    raise ValueError(f"cannot convert type: {type(value)}, value: {value} as type bool")
+
+
+def _DateParser(value) -> date:
+    # Fast path for the common YYYY-MM-DD form, which needs no strptime.
+    if isinstance(value, str) and len(value) == 10 and value[4] == "-" and value[7] == "-":
+        digits = value[:4] + value[5:7] + value[8:]
+        if digits.isascii() and digits.isdigit():
+            return date(int(value[:4]), int(value[5:7]), int(value[8:]))
+    return ParseTime(value).date()
+
+
 TypeToParser = {
     datetime: ParseTime,
-    date: lambda value: ParseTime(value).date,
-    bool: lambda value: value == "True" or value == True,
+    date: _DateParser,
+    bool: _BoolParser,
     bytes: _BytesParser,
 }
 
@@ -221,7 +379,7 @@ TypeToParser = {
 def SpecTypeParseValueGen(t) -> Callable[[str], Any]:
     # complex type, e.g. Union
     if IsGenericAlias(t):
-        parse_fn = partial(ParseComplexValue, t=t)
+        parse_fn = _CompileComplexParser(t)
     # try to use type to parser mapping or callable
     else:
         parse_fn = TypeToParser.get(t, t)
@@ -240,6 +398,17 @@ def DefaultParseValue(value):
     Returns:
       The parsed value, of the type determined most appropriate.
     """
+    if _IsBareWord(value):
+        return value
+    result = _CachedParseValue(value)
+    if isinstance(result, (str, bytes, int, float, complex, _NONE_TYPE)):
+        return result
+    # Containers are shared with the cache, so hand out a copy the caller owns.
+    return copy.deepcopy(result)
+
+
+@lru_cache(maxsize=1024)
+def _CachedParseValue(value):
     # Note: _LiteralEval will treat '#' as the start of a comment.
     try:
         return _LiteralEval(value)
@@ -248,6 +417,27 @@ def DefaultParseValue(value):
         return value
 
 
+# Characters that may make a value parse as something other than itself.
+_LITERAL_CHARS = frozenset("{}[](),:'\"-+.#0123456789")
+
+
+def _IsBareWord(value):
+    """Returns whether _LiteralEval would evaluate value to value itself.
+
+    Such values can skip the AST round trip entirely. Whitespace is excluded
+    since it is stripped by the parser, and non-ASCII values are excluded
+    since identifiers are NFKC-normalized by the parser.
+
+    Args:
+      value: A string from the command line.
+    Returns:
+      True if value is guaranteed to be parsed as the same string.
+    """
+    if value in ("True", "False", "None") or not value.isascii():
+        return False
+    return not any(c in _LITERAL_CHARS or c.isspace() for c in value)
+
+
 def _LiteralEval(value):
     """Parse value as a Python literal, or container of containers and literals.
 
@@ -271,16 +461,7 @@ def _LiteralEval(value):
     if isinstance(root.body, ast.BinOp):  # pytype: disable=attribute-error
         raise ValueError(value)
 
-    for node in ast.walk(root):
-        for field, child in ast.iter_fields(node):
-            if isinstance(child, list):
-                for index, subchild in enumerate(child):
-                    if isinstance(subchild, ast.Name):
-                        child[index] = _Replacement(subchild)
-
-            elif isinstance(child, ast.Name):
-                replacement = _Replacement(child)
-                setattr(node, field, replacement)
+    root = _BareWordTransformer().visit(root)
 
     # ast.literal_eval supports the following types:
     # strings, bytes, numbers, tuples, lists, dicts, sets, booleans, and None
@@ -288,6 +469,13 @@ def _LiteralEval(value):
     return ast.literal_eval(root)
 
 
+class _BareWordTransformer(ast.NodeTransformer):
+    """Replaces every Name node in an AST with its _Replacement."""
+
+    def visit_Name(self, node):
+        return _Replacement(node)
+
+
 def _Replacement(node):
     """Returns a node to use in place of the supplied node in the AST.
 
@@ -295,10 +483,10 @@ def _Replacement(node):
       node: A node of type Name. Could be a variable, or builtin constant.
     Returns:
       A node to use in place of the supplied Node. Either the same node, or a
-      String node whose value matches the Name node's id.
+      Constant node whose value is the Name node's id.
     """
     value = node.id
     # These are the only builtin constants supported by literal_eval.
     if value in ("True", "False", "None"):
         return node
-    return ast.Str(value)
+    return ast.copy_location(ast.Constant(value), node)
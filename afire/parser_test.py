@@ -18,13 +18,23 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
+from datetime import date, datetime
+from typing import Any, Counter, Dict, Generic, List, Literal, Optional, Tuple, TypeVar, Union
+
 from afire import parser
 from afire import testutils
 
+T = TypeVar("T")
+
+
+class _GenericBytes(bytes, Generic[T]):
+    pass
+
 
 class ParserTest(testutils.BaseTestCase):
     def testCreateParser(self):
         self.assertIsNotNone(parser.CreateParser())
+        self.assertIs(parser.CreateParser(), parser.CreateParser())
 
     def testSeparateFlagArgs(self):
         self.assertEqual(parser.SeparateFlagArgs([]), ([], []))
@@ -105,6 +115,11 @@ class ParserTest(testutils.BaseTestCase):
         self.assertEqual(parser.DefaultParseValue('(one, 2, "3")'), ("one", 2, "3"))
         self.assertEqual(parser.DefaultParseValue('one, "2", 3'), ("one", "2", 3))
 
+    def testDefaultParseValueReturnsFreshContainers(self):
+        first = parser.DefaultParseValue("[1, [2]]")
+        first[1].append(3)
+        self.assertEqual(parser.DefaultParseValue("[1, [2]]"), [1, [2]])
+
     def testDefaultParseValueNestedContainers(self):
         self.assertEqual(
             parser.DefaultParseValue('[(A, 2, "3"), 5, {alpha: 10.2, beta: "cat"}]'),
@@ -129,6 +144,113 @@ class ParserTest(testutils.BaseTestCase):
         self.assertEqual(parser.DefaultParseValue("2017-10-10"), "2017-10-10")
         self.assertEqual(parser.DefaultParseValue("1+1"), "1+1")
 
+    def testParseTime(self):
+        expected = datetime(2023, 9, 24, 12, 52, 33)
+        self.assertEqual(parser.ParseTime("2023-09-24-12:52:33"), expected)
+        self.assertEqual(parser.ParseTime("2023-09-24 12:52:33"), expected)
+        self.assertEqual(parser.ParseTime("2023/09/24 12:52:33"), expected)
+        self.assertEqual(parser.ParseTime("20230924125233"), expected)
+        self.assertEqual(parser.ParseTime("2023/09/24"), datetime(2023, 9, 24))
+        self.assertEqual(parser.ParseTime("2023-09-24"), datetime(2023, 9, 24))
+        self.assertEqual(parser.ParseTime("2023-9-24"), datetime(2023, 9, 24))
+        with self.assertRaises(ValueError):
+            parser.ParseTime("2023-13-24")
+        with self.assertRaises(ValueError):
+            parser.ParseTime(20230924)
+
+    def testSpecTypeParseValueGenDate(self):
+        parse_fn = parser.SpecTypeParseValueGen(date)
+        self.assertEqual(parse_fn("2023-09-24"), date(2023, 9, 24))
+        self.assertEqual(parse_fn("2023/09/24"), date(2023, 9, 24))
+        self.assertEqual(parse_fn("2023-09-24 12:52:33"), date(2023, 9, 24))
+        with self.assertRaises(ValueError):
+            parse_fn("2023-02-30")
+
+    def testSpecTypeParseValueGenBool(self):
+        parse_fn = parser.SpecTypeParseValueGen(bool)
+        self.assertIs(parse_fn("True"), True)
+        self.assertIs(parse_fn("1"), True)
+        self.assertIs(parse_fn("False"), False)
+        self.assertIs(parse_fn("0"), False)
+        with self.assertRaises(ValueError):
+            parse_fn("alpha")
+
+        parse_fn = parser.SpecTypeParseValueGen(List[bool])
+        self.assertEqual(parse_fn("[True, 0, 1]"), [True, False, True])
+        with self.assertRaises(ValueError):
+            parse_fn("[1.0]")
+        with self.assertRaises(ValueError):
+            parse_fn("[2]")
+
+    def testSpecTypeParseValueGenBytesList(self):
+        parse_fn = parser.SpecTypeParseValueGen(List[bytes])
+        self.assertEqual(parse_fn("[1, b'x', y]"), [(1).to_bytes(8, "big"), b"x", b"y"])
+        with self.assertRaises(ValueError):
+            parse_fn("[-1]")
+        with self.assertRaises(ValueError):
+            parse_fn("[%d]" % 2**64)
+        self.assertEqual(parser.SpecTypeParseValueGen(Union[List[bytes], str])("[-1]"), "[-1]")
+
+    def testSpecTypeParseValueGenOptionalError(self):
+        parse_fn = parser.SpecTypeParseValueGen(Optional[int])
+        self.assertIsNone(parse_fn("None"))
+        self.assertEqual(parse_fn("1"), 1)
+        with self.assertRaisesRegex(ValueError, r'cannot parse value "abc" to type typing.Optional\[int\]'):
+            parse_fn("abc")
+
+        parse_fn = parser.SpecTypeParseValueGen(List[Optional[int]])
+        self.assertEqual(parse_fn("[1, None]"), [1, None])
+        with self.assertRaisesRegex(ValueError, r'cannot parse value "abc" to type typing.Optional\[int\]'):
+            parse_fn("[abc]")
+
+    def testSpecTypeParseValueGenTupleWithNone(self):
+        parse_fn = parser.SpecTypeParseValueGen(Tuple[int, None])
+        self.assertEqual(parse_fn("(1, None)"), (1, None))
+        with self.assertRaises(ValueError):
+            parse_fn("(1, 2)")
+
+    def testSpecTypeParseValueGenDictPassThrough(self):
+        self.assertEqual(parser.SpecTypeParseValueGen(Dict[str, Any])("{a: [1, x]}"), {"a": [1, "x"]})
+        self.assertEqual(parser.SpecTypeParseValueGen(Dict[str, T])("{a: (1, x)}"), {"a": (1, "x")})
+
+    def testSpecTypeParseValueGenUnsupportedGeneric(self):
+        with self.assertRaises(ValueError):
+            parser.SpecTypeParseValueGen(Literal["a", "b"])("a")
+        # Unsupported members of a Union fall through to the next member.
+        self.assertEqual(parser.SpecTypeParseValueGen(Union[Literal["a"], int])("1"), 1)
+
+    def testSpecTypeParseValueGenMismatchedGenericArgs(self):
+        # Counter[str] has a dict origin but only one arg.
+        with self.assertRaises(ValueError):
+            parser.SpecTypeParseValueGen(Counter[str])("{a: 1}")
+        self.assertEqual(parser.SpecTypeParseValueGen(Union[Counter[str], int])("1"), 1)
+        self.assertEqual(parser.SpecTypeParseValueGen(List[Union[Counter[str], int]])("[1]"), [1])
+
+    def testSpecTypeParseValueGenBytesSubclass(self):
+        parse_fn = parser.SpecTypeParseValueGen(_GenericBytes[int])
+        self.assertEqual(parse_fn("xyz"), b"xyz")
+        self.assertEqual(parse_fn("b'xyz'"), b"xyz")
+        with self.assertRaises(ValueError):
+            parse_fn("1")
+
+    def testSpecTypeParseValueGenUsesLaterTypeToParserEntries(self):
+        class Custom(object):
+            pass
+
+        parse_fn = parser.SpecTypeParseValueGen(List[Custom])
+        self.assertRaises(TypeError, parse_fn, "[1]")
+        parser.TypeToParser[Custom] = str
+        try:
+            self.assertEqual(parse_fn("[1]"), ["1"])
+            self.assertEqual(parser.SpecTypeParseValueGen(List[Custom])("[2]"), ["2"])
+        finally:
+            del parser.TypeToParser[Custom]
+
+    def testSpecTypeParseValueGenUnionOrder(self):
+        # Union[int, str] == Union[str, int], but the member order must be kept.
+        self.assertEqual(parser.SpecTypeParseValueGen(Union[int, str])("1"), 1)
+        self.assertEqual(parser.SpecTypeParseValueGen(Union[str, int])("1"), "1")
+
 
 if __name__ == "__main__":
     testutils.main()